@@ -11,6 +11,7 @@ module butterfly_tb (
 
 logic [7:0] current_test_id = 0;
     // Dump the signals to a VCD file
+`ifndef NO_WAVES
     string vcd_name;
     initial begin
 `ifdef VCD_PATH
@@ -22,6 +23,7 @@ logic [7:0] current_test_id = 0;
         $dumpvars(0, butterfly_tb);
         #1;
     end
+`endif
 
     // Instantiate the butterfly unit (DUT)
     butterfly dut (
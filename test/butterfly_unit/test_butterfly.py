@@ -1,5 +1,10 @@
 import cocotb
+import itertools
+import os
 from cocotb.triggers import Timer
+import numpy as np
+
+from refmodel import W0_R, W0_I, W1_R, W1_I, signed8, butterfly_ref_model, butterfly_batch
 
 TEST_IDS = {
     "neg1_twiddle":    1,
@@ -7,140 +12,127 @@ TEST_IDS = {
     "basic_butterfly": 3,
     "simple_multiply": 4,
     "rand_twiddle":    5,
+    "corner_sweep":    6,
 }
 
-def signed(val, bits):
-    """Convert unsigned to signed."""
-    if val >= (1 << (bits - 1)):
-        return val - (1 << bits)
-    return val
-
-def wrap8(x):
-    """Wrap to signed 8-bit range (-128 to 127) as 2's complement."""
-    if x > 127:
-        x -= 256
-    elif x < -128:
-        x += 256
-    return x
-
-def pack_complex(r, i):
-    """Pack signed 8-bit real and imag into 16-bit int."""
-    return ((r & 0xFF) << 8) | (i & 0xFF)
-
-def unpack_complex(val):
-    """Unpack signed 8-bit real and imag from 16-bit int."""
-    r = (val >> 8) & 0xFF
-    i = val & 0xFF
-    if r & 0x80:
-        r -= 0x100
-    if i & 0x80:
-        i -= 0x100
-    return r, i
-
-def butterfly_reference(a_r, a_i, b_r, b_i, t_r, t_i):
-    """Reference butterfly logic matching Verilog behavior (signed 8-bit, WIDTH=8)."""
-    # Complex multiply: (t_r + jt_i) * (b_r + jb_i)
-    prod_real = t_r * b_r - t_i * b_i
-    prod_imag = t_i * b_r + t_r * b_i
-
-    # Arithmetic shift right with rounding: >>> (WIDTH - 1) = >>> 7
-    def trunc(val):
-        return wrap8(val >> 7)  # no rounding
-
-    pr = trunc(prod_real)
-    pi = trunc(prod_imag)
-
-    pos_r = wrap8(a_r + pr)
-    pos_i = wrap8(a_i + pi)
-    neg_r = wrap8(a_r - pr)
-    neg_i = wrap8(a_i - pi)
-
-    return (pos_r, pos_i), (neg_r, neg_i)
-
-# ---------- CHANGED: run_test now takes an extra 'test_id' ----------
-async def run_test(dut, A, B, T, test_id):
+# Samples are plain (real, imag) tuples of signed 8-bit ints
+SUPPORTED_TWIDDLES = ((-1, 0), (0, -1))
+NUM_RANDOM_VECTORS = 16
+
+# Every combination of 8-bit corner values on A and B, built once at import.
+# Besides the unit twiddles it uses fft_engine's real W0/W1, whose full-scale
+# products reach the -(-128) wrap (6**4 * 4 = 5184 vectors)
+CORNER_VALUES = (-128, -127, -1, 0, 1, 127)
+CORNER_TWIDDLES = SUPPORTED_TWIDDLES + ((W0_R, W0_I), (W1_R, W1_I))
+CORNER_SWEEP = [((a_r, a_i), (b_r, b_i), T)
+                for a_r, a_i, b_r, b_i in itertools.product(CORNER_VALUES, repeat=4)
+                for T in CORNER_TWIDDLES]
+
+async def drive_vector(dut, A, B, T, test_id):
+    """Drive one (A, B, T) vector and return the DUT's (Pos, Neg) outputs."""
     # Drive the indicator visible in the waveform
     dut.current_test_id.value = test_id
 
-    a_r, a_i = unpack_complex(A)
-    b_r, b_i = unpack_complex(B)
-    t_r, t_i = unpack_complex(T)
+    a_r, a_i = A
+    b_r, b_i = B
+    t_r, t_i = T
 
-    dut.A_real.value = a_r
-    dut.A_imag.value = a_i
-    dut.B_real.value = b_r
-    dut.B_imag.value = b_i
-    dut.W_real.value = t_r
-    dut.W_imag.value = t_i
+    # The DUT is combinational, so deposit all inputs immediately rather than
+    # queueing six separate writes for the scheduler's next write phase
+    dut.A_real.setimmediatevalue(a_r)
+    dut.A_imag.setimmediatevalue(a_i)
+    dut.B_real.setimmediatevalue(b_r)
+    dut.B_imag.setimmediatevalue(b_i)
+    dut.W_real.setimmediatevalue(t_r)
+    dut.W_imag.setimmediatevalue(t_i)
 
     await Timer(1, units='ns')
 
-    pos_r = signed(int(dut.Pos_real.value), 8)
-    pos_i = signed(int(dut.Pos_imag.value), 8)
-    neg_r = signed(int(dut.Neg_real.value), 8)
-    neg_i = signed(int(dut.Neg_imag.value), 8)
+    # One read per output, decoded as signed 8-bit
+    pos_r = signed8(int(dut.Pos_real.value))
+    pos_i = signed8(int(dut.Pos_imag.value))
+    neg_r = signed8(int(dut.Neg_real.value))
+    neg_i = signed8(int(dut.Neg_imag.value))
 
-    expected_pos, expected_neg = butterfly_reference(a_r, a_i, b_r, b_i, t_r, t_i)
+    # clear indicator so gaps are obvious
+    dut.current_test_id.value = 0
 
-    print(f"A={a_r}+j{a_i}, B={b_r}+j{b_i}, T={t_r}+j{t_i}")
-    print(f"  DUT Pos=({pos_r}, {pos_i}), Neg=({neg_r}, {neg_i})")
-    print(f"  EXPECTED Pos={expected_pos}, Neg={expected_neg}")
+    return (pos_r, pos_i), (neg_r, neg_i)
 
-    assert (pos_r, pos_i) == expected_pos, f"Pos mismatch: got ({pos_r}, {pos_i}), expected {expected_pos}"
-    assert (neg_r, neg_i) == expected_neg, f"Neg mismatch: got ({neg_r}, {neg_i}), expected {expected_neg}"
+# ---------- CHANGED: run_test now takes an extra 'test_id' ----------
+async def run_test(dut, A, B, T, test_id):
+    (pos_r, pos_i), (neg_r, neg_i) = await drive_vector(dut, A, B, T, test_id)
 
-    # clear indicator so gaps are obvious
-    dut.current_test_id.value = 0
+    a_r, a_i = A
+    b_r, b_i = B
+    t_r, t_i = T
+    expected_pos, expected_neg = butterfly_ref_model(a_r, a_i, b_r, b_i, t_r, t_i)
 
-@cocotb.test()
-async def test_neg1_twiddle(dut):
-    """Test with T = 0xFF00 (-1 + 0j)"""
-    await run_test(dut,
-        A=pack_complex(10, 20),
-        B=pack_complex(5, 15),
-        T=0xFF00,
-        test_id=TEST_IDS["neg1_twiddle"]
-    )
+    # Lazy %-style args: nothing is formatted unless DEBUG logging is enabled
+    dut._log.debug("A=%d+j%d, B=%d+j%d, T=%d+j%d", a_r, a_i, b_r, b_i, t_r, t_i)
+    dut._log.debug("  DUT Pos=(%d, %d), Neg=(%d, %d)", pos_r, pos_i, neg_r, neg_i)
+    dut._log.debug("  EXPECTED Pos=%s, Neg=%s", expected_pos, expected_neg)
 
-@cocotb.test()
-async def test_negj_twiddle(dut):
-    """Test with T = 0x00FF (0 - 1j)"""
-    await run_test(dut,
-        A=pack_complex(10, 20),
-        B=pack_complex(5, 15),
-        T=0x00FF,
-        test_id=TEST_IDS["negj_twiddle"]
-    )
+    assert (pos_r, pos_i) == expected_pos, f"Pos mismatch: got ({pos_r}, {pos_i}), expected {expected_pos}"
+    assert (neg_r, neg_i) == expected_neg, f"Neg mismatch: got ({neg_r}, {neg_i}), expected {expected_neg}"
 
-@cocotb.test()
-async def test_basic_butterfly(dut):
-    """Basic test with A=(1,1), B=(2,2), T=-1"""
-    await run_test(dut,
-        A=pack_complex(1, 1),
-        B=pack_complex(2, 2),
-        T=0xFF00,
-        test_id=TEST_IDS["basic_butterfly"]
-    )
+# Directed cases as (test id name, A, B, T); run back-to-back in one test since
+# the combinational DUT needs no per-case setup
+DIRECTED_CASES = [
+    ("neg1_twiddle",    (10, 20), (5, 15), (-1, 0)),
+    ("negj_twiddle",    (10, 20), (5, 15), (0, -1)),
+    ("basic_butterfly", (1, 1),   (2, 2),  (-1, 0)),
+    ("simple_multiply", (0, 0),   (2, 0),  (0, -1)),
+]
 
 @cocotb.test()
-async def test_simple_multiply(dut):
-    """Simple test with A=(0,0), B=(2,0), T=-j"""
-    await run_test(dut,
-        A=pack_complex(0, 0),
-        B=pack_complex(2, 0),
-        T=0x00FF,
-        test_id=TEST_IDS["simple_multiply"]
-    )
+async def test_directed_cases(dut):
+    """Directed vectors for both supported twiddles"""
+    for name, A, B, T in DIRECTED_CASES:
+        dut._log.info("Running directed case %s", name)
+        await run_test(dut, A, B, T, test_id=TEST_IDS[name])
 
 @cocotb.test()
 async def test_random_supported_twiddles(dut):
     """Randomized test with supported fixed twiddles"""
     test_vectors = [
-        (pack_complex(29, 70), pack_complex(50, -125), 0xFF00),
-        (pack_complex(93, 44), pack_complex(-52, -100), 0x00FF),
-        (pack_complex(-64, 127), pack_complex(-64, -64), 0xFF00),
-        (pack_complex(100, -100), pack_complex(10, 10), 0x00FF),
+        ((29, 70), (50, -125), (-1, 0)),
+        ((93, 44), (-52, -100), (0, -1)),
+        ((-64, 127), (-64, -64), (-1, 0)),
+        ((100, -100), (10, 10), (0, -1)),
     ]
+
+    # Draw all random A/B samples and twiddle choices in one go
+    rng = np.random.default_rng(42)
+    samples = rng.integers(-128, 128, size=(NUM_RANDOM_VECTORS, 2, 2)).tolist()
+    twiddles = rng.integers(0, len(SUPPORTED_TWIDDLES), size=NUM_RANDOM_VECTORS).tolist()
+    test_vectors += [(tuple(A), tuple(B), SUPPORTED_TWIDDLES[t])
+                     for (A, B), t in zip(samples, twiddles)]
+
+    # Collect every DUT output, then check the whole batch against one
+    # vectorized reference evaluation
+    dut_pos, dut_neg = [], []
     for i, (A, B, T) in enumerate(test_vectors):
-        print(f"\n--- Running random test {i+1} ---")
-        await run_test(dut, A, B, T, test_id=TEST_IDS["rand_twiddle"])
+        dut._log.debug("--- Running random test %d ---", i + 1)
+        pos, neg = await drive_vector(dut, A, B, T, test_id=TEST_IDS["rand_twiddle"])
+        dut_pos.append(pos)
+        dut_neg.append(neg)
+
+    As, Bs, Ts = zip(*test_vectors)
+    expected_pos, expected_neg = butterfly_batch(As, Bs, Ts)
+    np.testing.assert_array_equal(dut_pos, expected_pos, err_msg="Pos mismatch")
+    np.testing.assert_array_equal(dut_neg, expected_neg, err_msg="Neg mismatch")
+
+@cocotb.test(skip=os.getenv("FAST") == "1")
+async def test_corner_sweep(dut):
+    """Sweep all corner-value A/B combinations for the unit and fft_engine twiddles"""
+    dut_pos, dut_neg = [], []
+    for A, B, T in CORNER_SWEEP:
+        pos, neg = await drive_vector(dut, A, B, T, test_id=TEST_IDS["corner_sweep"])
+        dut_pos.append(pos)
+        dut_neg.append(neg)
+
+    As, Bs, Ts = zip(*CORNER_SWEEP)
+    expected_pos, expected_neg = butterfly_batch(As, Bs, Ts)
+    np.testing.assert_array_equal(dut_pos, expected_pos, err_msg="Pos mismatch")
+    np.testing.assert_array_equal(dut_neg, expected_neg, err_msg="Neg mismatch")
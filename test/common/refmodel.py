@@ -0,0 +1,152 @@
+"""Shared bit-accurate reference models for the cocotb testbenches."""
+
+import numpy as np
+
+# Twiddle factors used in fft_engine.sv (Q1.7 format: -128 represents -1.0)
+W0_R, W0_I = -128, 0  # Represents -1.0
+W1_R, W1_I = 0, -128  # Represents -j
+
+def signed8(val):
+    """Convert an unsigned 8-bit value from a Verilog sim to a signed Python integer."""
+    return ((val & 0xFF) ^ 0x80) - 0x80
+
+def wrap8(x):
+    """Wrap a Python integer to the signed 8-bit range [-128, 127]."""
+    return ((x + 128) & 0xFF) - 128
+
+def model_data_transform(data_in):
+    """
+    A bit-accurate Python model of the memory_ctrl data transformation:
+    `$signed(nibble) << 4`. This is the "golden reference".
+    """
+    real_nibble = (data_in >> 4) & 0xF
+    imag_nibble = data_in & 0xF
+
+    real_val = (real_nibble ^ 0x8) - 0x8
+    imag_val = (imag_nibble ^ 0x8) - 0x8
+
+    return (real_val << 4, imag_val << 4)
+
+# model_data_transform() for every possible 8-bit data_in, so model writes
+# are a single lookup
+DATA_TRANSFORM_LUT = tuple(model_data_transform(d) for d in range(256))
+
+def butterfly_ref_model(a_r, a_i, b_r, b_i, t_r, t_i, width=8):
+    """
+    Reference butterfly logic matching butterfly.sv.
+    The product is truncated with `>>> (WIDTH - 1)` (no rounding), and every
+    output wraps to signed 8 bits like the RTL.
+    """
+    # Complex multiply: (t_r + jt_i) * (b_r + jb_i)
+    prod_real = t_r * b_r - t_i * b_i
+    prod_imag = t_i * b_r + t_r * b_i
+
+    # Scale by shifting right, simulating Verilog's `>>> (WIDTH - 1)`
+    pr = wrap8(prod_real >> (width - 1))
+    pi = wrap8(prod_imag >> (width - 1))
+
+    # Calculate butterfly outputs with 8-bit wrapping
+    pos_r = wrap8(a_r + pr)
+    pos_i = wrap8(a_i + pi)
+    neg_r = wrap8(a_r - pr)
+    neg_i = wrap8(a_i - pi)
+
+    return (pos_r, pos_i), (neg_r, neg_i)
+
+def butterfly_w0(a_r, a_i, b_r, b_i):
+    """butterfly_ref_model() specialized for W0 = -1 (-128 + 0j).
+
+    (-128 * b) >>> 7 is exactly -b, so the scaled product is just -B.
+    """
+    pr = wrap8(-b_r)
+    pi = wrap8(-b_i)
+    return (wrap8(a_r + pr), wrap8(a_i + pi)), (wrap8(a_r - pr), wrap8(a_i - pi))
+
+def butterfly_w1(a_r, a_i, b_r, b_i):
+    """butterfly_ref_model() specialized for W1 = -j (0 - 128j).
+
+    The scaled product of -j and B is (b_i, -b_r).
+    """
+    pr = wrap8(b_i)
+    pi = wrap8(-b_r)
+    return (wrap8(a_r + pr), wrap8(a_i + pi)), (wrap8(a_r - pr), wrap8(a_i - pi))
+
+def fft_engine_ref_model(in0, in1, in2, in3):
+    """
+    A bit-accurate Python reference model for the 4-point fft_engine DUT.
+    This model follows the exact data path and component connections from fft_engine.sv.
+    Returns a dict of (real, imag) outputs keyed out0..out3.
+    """
+    in0_r, in0_i = in0
+    in1_r, in1_i = in1
+    in2_r, in2_i = in2
+    in3_r, in3_i = in3
+
+    # --- Stage 1 ---
+    # bfly_stage1_0: A=in0, B=in2, W=W0
+    (s1_0_pos_r, s1_0_pos_i), (s1_0_neg_r, s1_0_neg_i) = butterfly_w0(
+        in0_r, in0_i, in2_r, in2_i
+    )
+    # bfly_stage1_1: A=in1, B=in3, W=W0
+    (s1_1_pos_r, s1_1_pos_i), (s1_1_neg_r, s1_1_neg_i) = butterfly_w0(
+        in1_r, in1_i, in3_r, in3_i
+    )
+
+    # --- Stage 2 ---
+    # First butterfly (W=+1) on s1 outputs
+    out0_r = wrap8(s1_0_pos_r + s1_1_pos_r)
+    out0_i = wrap8(s1_0_pos_i + s1_1_pos_i)
+    out2_r = wrap8(s1_0_pos_r - s1_1_pos_r)
+    out2_i = wrap8(s1_0_pos_i - s1_1_pos_i)
+    
+    # Second butterfly (W=-j) on other s1 outputs
+    (out1_r, out1_i), (out3_r, out3_i) = butterfly_w1(
+        s1_0_neg_r, s1_0_neg_i, s1_1_neg_r, s1_1_neg_i
+    )
+
+    return {
+        'out0': (out0_r, out0_i),
+        'out1': (out1_r, out1_i),
+        'out2': (out2_r, out2_i),
+        'out3': (out3_r, out3_i),
+    }
+
+def butterfly_batch(A, B, T):
+    """Vectorized butterfly_ref_model over (N, 2) arrays of (real, imag) samples.
+
+    Returns (Pos, Neg) as (N, 2) arrays. The twiddle product is one complex64
+    multiply: every 8-bit product and sum is exact in float32, and dividing by
+    128 then flooring is the same as `>>> 7`. Masking to 8 bits gives the same
+    2's complement wrap as wrap8() for every 8-bit input.
+    """
+    a = np.asarray(A, dtype=np.int32)
+    # View each (real, imag) row as a single complex value without copying
+    b = np.ascontiguousarray(B, dtype=np.float32).view(np.complex64)
+    t = np.ascontiguousarray(T, dtype=np.float32).view(np.complex64)
+
+    prod = np.floor((t * b).view(np.float32) / 128).astype(np.int32)
+
+    pos = ((a + prod + 128) & 0xFF) - 128
+    neg = ((a - prod + 128) & 0xFF) - 128
+    return pos, neg
+
+def fft_engine_batch(X):
+    """
+    Vectorized 4-point fft_engine model over an (N, 4, 2) array of input frames.
+    Each stage runs once over the whole batch; returns an (N, 4, 2) array of
+    (real, imag) outputs in port order.
+    """
+    x = np.asarray(X, dtype=np.int32)
+    w0 = np.broadcast_to((W0_R, W0_I), x[:, 0].shape)
+    w1 = np.broadcast_to((W1_R, W1_I), x[:, 0].shape)
+
+    # --- Stage 1 ---
+    s1_0_pos, s1_0_neg = butterfly_batch(x[:, 0], x[:, 2], w0)
+    s1_1_pos, s1_1_neg = butterfly_batch(x[:, 1], x[:, 3], w0)
+
+    # --- Stage 2 ---
+    out0 = ((s1_0_pos + s1_1_pos + 128) & 0xFF) - 128
+    out2 = ((s1_0_pos - s1_1_pos + 128) & 0xFF) - 128
+    out1, out3 = butterfly_batch(s1_0_neg, s1_1_neg, w1)
+
+    return np.stack([out0, out1, out2, out3], axis=1)
@@ -2,7 +2,7 @@
 `timescale 1ns / 1ps
 
 module fft_engine_tb (
-    input  logic clk, rst,
+    input  logic rst,
     input  logic signed [7:0] in0_real, in0_imag,
     input  logic signed [7:0] in1_real, in1_imag,
     input  logic signed [7:0] in2_real, in2_imag,
@@ -15,7 +15,13 @@ module fft_engine_tb (
 
 logic [7:0] current_test_id = 0;
 
+    // Free-running 100 MHz clock generated in HDL: the simulator toggles it
+    // natively, and the cocotb tests only wait on its edges
+    logic clk = 1'b0;
+    always #5 clk = ~clk;
+
     // Dump signals
+`ifndef NO_WAVES
     string vcd_name;
     initial begin
 `ifdef VCD_PATH
@@ -27,6 +33,7 @@ logic [7:0] current_test_id = 0;
         $dumpvars(0, fft_engine_tb);
         #1;
     end
+`endif
 
     // Instantiate DUT
     fft_engine dut (
@@ -18,6 +18,7 @@ module io_ctrl_tb (
 logic [7:0] current_test_id = 0;
 
     // Dump signals for waveform viewing
+`ifndef NO_WAVES
     string vcd_name;
     initial begin
 `ifdef VCD_PATH
@@ -29,6 +30,40 @@ logic [7:0] current_test_id = 0;
         $dumpvars(0, io_ctrl_tb);
         #1;
     end
+`endif
+
+    // Self-checking reference for both pulses and the address counter. It
+    // keeps its own copy of the edge detectors and checks the DUT on every
+    // clock edge, so tests only drive stimulus and read the result. With ena
+    // low the reference state holds, so addr must hold too.
+    logic       chk_prev_in0, chk_prev_in1;
+    logic [1:0] chk_addr;
+    logic [7:0] chk_loads;   // ui_in0 rising edges counted while ena
+    logic       chk_error;   // sticky: set on the first mismatch
+
+    always_ff @(posedge clk or posedge rst) begin
+        if (rst) begin
+            chk_prev_in0 <= 1'b0;
+            chk_prev_in1 <= 1'b0;
+            chk_addr     <= '0;
+            chk_loads    <= '0;
+            chk_error    <= 1'b0;
+        end else begin
+            if (load_pulse   !== (ui_in0 && !chk_prev_in0) ||
+                output_pulse !== (ui_in1 && !chk_prev_in1) ||
+                addr !== chk_addr)
+                chk_error <= 1'b1;
+
+            if (ena) begin
+                chk_prev_in0 <= ui_in0;
+                chk_prev_in1 <= ui_in1;
+                if (ui_in0 && !chk_prev_in0) begin
+                    chk_addr  <= chk_addr + 1'b1;
+                    chk_loads <= chk_loads + 1'b1;
+                end
+            end
+        end
+    end
 
     // Instantiate the DUT
     io_ctrl dut (
@@ -1,6 +1,6 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
+from cocotb.triggers import ClockCycles, RisingEdge, Timer
 
 TEST_IDS = {
     "reset":      1,
@@ -33,7 +33,7 @@ async def test_reset(dut):
     dut.ui_in1.value = 1
     await RisingEdge(dut.clk)
     
-    assert dut.addr.value != 0
+    assert int(dut.addr.value) != 0
 
     dut.rst.value = 1
     dut.ui_in0.value = 0
@@ -41,59 +41,49 @@ async def test_reset(dut):
     await Timer(5, 'ns')  # Wait for reset to propagate
 
     dut._log.info("Checking outputs during reset")
-    assert dut.addr.value == 0
-    assert dut.load_pulse.value == 0
-    assert dut.output_pulse.value == 0
+    assert int(dut.addr.value) == 0
+    assert int(dut.load_pulse.value) == 0
+    assert int(dut.output_pulse.value) == 0
     
     # Release reset
     dut.rst.value = 0
     await RisingEdge(dut.clk)
     dut._log.info("Reset released, checking outputs remain zero")
-    assert dut.addr.value == 0
+    assert int(dut.addr.value) == 0
 
     dut._log.info("Reset test passed")
     dut.current_test_id.value = 0                           
 
-@cocotb.test()
-async def test_counter_and_load_pulse(dut):
+async def scenario_counter_and_load_pulse(dut):
     """Verify counter increments and load_pulse fires on ui_in0 rising edge."""
     dut.current_test_id.value = TEST_IDS["counter"]        
     dut._log.info("Starting counter and load_pulse test")
-    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
     await reset_dut(dut)
     
     dut.ena.value = 1
 
-    for i in range(5):
-        current_addr = dut.addr.value.integer
-        expected_addr = (current_addr + 1) % 4
-        dut._log.info(f"Test cycle {i}. Current addr={current_addr}. Expecting next addr={expected_addr}")
-
-        # Drive rising edge on ui_in0
-        dut.ui_in0.value = 1
-        
-        await RisingEdge(dut.clk)
-        
-        assert dut.load_pulse.value == 1, f"load_pulse should be 1 right after ui_in0 rising edge (cycle {i})"
-        assert dut.addr.value == current_addr, f"addr should still be {current_addr} immediately after edge (cycle {i})"
-        
-        await RisingEdge(dut.clk)
-        assert dut.load_pulse.value == 0, f"load_pulse should be 0 when ui_in0 is held high (cycle {i})"
-        assert dut.addr.value == expected_addr, f"addr should now be {expected_addr} one cycle later (cycle {i})"
-
-        dut.ui_in0.value = 0
-        await RisingEdge(dut.clk)
-        assert dut.addr.value == expected_addr, f"addr should not change on ui_in0 falling edge (cycle {i})"
+    # Drive five ui_in0 pulses; the checker in io_ctrl_tb compares load_pulse
+    # and addr against its own model on every clock edge
+    num_pulses = 5
+    clk, ui_in0 = dut.clk, dut.ui_in0   # resolve the handles once for the loop
+    for i in range(num_pulses):
+        ui_in0.value = 1
+        await ClockCycles(clk, 2)   # rising edge, then held high
+        ui_in0.value = 0
+        await RisingEdge(clk)       # falling edge must not count
+
+    assert int(dut.chk_error.value) == 0, "load_pulse/addr diverged from the tb checker"
+    assert int(dut.chk_loads.value) == num_pulses, \
+        f"checker saw {int(dut.chk_loads.value)} load pulses, expected {num_pulses}"
+    assert int(dut.addr.value) == num_pulses % 4, f"addr should have wrapped to {num_pulses % 4}"
 
     dut._log.info("Counter and load_pulse test passed")
     dut.current_test_id.value = 0                           
 
-@cocotb.test()
-async def test_output_pulse(dut):
+async def scenario_output_pulse(dut):
     """Verify output_pulse fires on ui_in1 rising edge and does not affect counter."""
     dut.current_test_id.value = TEST_IDS["output"]          
     dut._log.info("Starting output_pulse test")
-    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
     await reset_dut(dut)
     
     dut.ena.value = 1
@@ -101,48 +91,41 @@ async def test_output_pulse(dut):
     dut.ui_in1.value = 1
     await RisingEdge(dut.clk)
 
-    assert dut.output_pulse.value == 1, "output_pulse should be 1 after ui_in1 rising edge"
-    assert dut.addr.value == 0, "addr should not change on ui_in1 edge"
+    assert int(dut.output_pulse.value) == 1, "output_pulse should be 1 after ui_in1 rising edge"
+    assert int(dut.addr.value) == 0, "addr should not change on ui_in1 edge"
     
     await RisingEdge(dut.clk)
-    assert dut.output_pulse.value == 0, "output_pulse should be 0 when ui_in1 is held high"
-    assert dut.addr.value == 0, "addr should remain unchanged"
+    assert int(dut.output_pulse.value) == 0, "output_pulse should be 0 when ui_in1 is held high"
+    assert int(dut.addr.value) == 0, "addr should remain unchanged"
     
     dut._log.info("output_pulse test passed")
     dut.current_test_id.value = 0                           
 
-@cocotb.test()
-async def test_ena_gate(dut):
+async def scenario_ena_gate(dut):
     """Verify state changes are correctly gated by ena."""
     dut.current_test_id.value = TEST_IDS["ena"]             
     dut._log.info("Starting ena gate test")
-    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
     await reset_dut(dut)
 
     dut.ena.value = 0
-    
+
+    # Both pulses still fire with ena low, but the registered state must
+    # hold; the tb checker verifies both on each of the two edges
     dut.ui_in0.value = 1
     dut.ui_in1.value = 1
-    await RisingEdge(dut.clk)
+    await ClockCycles(dut.clk, 2)
 
-    assert dut.load_pulse.value == 1, "BUG: load_pulse fires even when ena is low"
-    assert dut.output_pulse.value == 1, "BUG: output_pulse fires even when ena is low"
-    
-    dut._log.info("Verifying that registered address does not change.")
-    assert dut.addr.value == 0, "addr should not change when ena is low"
-    
-    await RisingEdge(dut.clk)
-    assert dut.addr.value == 0, "addr should remain stable when ena is low"
+    assert int(dut.chk_error.value) == 0, "pulses/addr diverged from the tb checker with ena low"
+    assert int(dut.chk_loads.value) == 0, "no load should be counted while ena is low"
+    assert int(dut.addr.value) == 0, "addr should remain stable when ena is low"
 
     dut._log.info("Ena gate test passed")
     dut.current_test_id.value = 0                           
 
-@cocotb.test()
-async def test_simultaneous_pulses(dut):
+async def scenario_simultaneous_pulses(dut):
     """Verify behavior when both inputs have a rising edge at the same time."""
     dut.current_test_id.value = TEST_IDS["simul"]           
     dut._log.info("Starting simultaneous pulses test")
-    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
     await reset_dut(dut)
     
     dut.ena.value = 1
@@ -151,14 +134,30 @@ async def test_simultaneous_pulses(dut):
     dut.ui_in1.value = 1
     await RisingEdge(dut.clk)
     
-    assert dut.load_pulse.value == 1, "load_pulse should fire on simultaneous edge"
-    assert dut.output_pulse.value == 1, "output_pulse should fire on simultaneous edge"
-    assert dut.addr.value == 0, "addr should not have updated yet"
+    assert int(dut.load_pulse.value) == 1, "load_pulse should fire on simultaneous edge"
+    assert int(dut.output_pulse.value) == 1, "output_pulse should fire on simultaneous edge"
+    assert int(dut.addr.value) == 0, "addr should not have updated yet"
     
     await RisingEdge(dut.clk)
-    assert dut.addr.value == 1, "addr should increment one cycle after simultaneous edge"
-    assert dut.load_pulse.value == 0, "load_pulse should clear"
-    assert dut.output_pulse.value == 0, "output_pulse should clear"
+    assert int(dut.addr.value) == 1, "addr should increment one cycle after simultaneous edge"
+    assert int(dut.load_pulse.value) == 0, "load_pulse should clear"
+    assert int(dut.output_pulse.value) == 0, "output_pulse should clear"
 
     dut._log.info("Simultaneous pulses test passed")
     dut.current_test_id.value = 0                           
+
+# The pulse scenarios share one test so they run on a single clock and
+# elaboration; each starts from its own reset_dut()
+PULSE_SCENARIOS = [
+    scenario_counter_and_load_pulse,
+    scenario_output_pulse,
+    scenario_ena_gate,
+    scenario_simultaneous_pulses,
+]
+
+@cocotb.test()
+async def test_pulse_scenarios(dut):
+    """Run every pulse scenario back-to-back, resetting between them."""
+    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
+    for scenario in PULSE_SCENARIOS:
+        await scenario(dut)
@@ -3,7 +3,6 @@
 
 module memory_ctrl_tb (
     // Control Signals
-    input  logic clk,
     input  logic rst,
     input  logic ena,
     input  logic load_pulse,
@@ -12,6 +11,11 @@ module memory_ctrl_tb (
     input  logic [1:0] addr,
     input  logic [7:0] data_in,
 
+    // Packed stimulus {load_pulse, ena, addr, data_in}, used instead of the
+    // individual ports while stim_en is 1
+    input  logic        stim_en,
+    input  logic [11:0] stim,
+
     // Read Outputs
     output logic signed [7:0] real0_out, imag0_out,
     output logic signed [7:0] real1_out, imag1_out,
@@ -21,7 +25,13 @@ module memory_ctrl_tb (
 
 logic [7:0] current_test_id = 0;
 
+    // Free-running 100 MHz clock generated in HDL: the simulator toggles it
+    // natively, and the cocotb tests only wait on its edges
+    logic clk = 1'b0;
+    always #5 clk = ~clk;
+
     // Dump the signals to a VCD file for debugging
+`ifndef NO_WAVES
     string vcd_name;
     initial begin
 `ifdef VCD_PATH
@@ -33,6 +43,42 @@ logic [7:0] current_test_id = 0;
         $dumpvars(0, memory_ctrl_tb);
         #1;
     end
+`endif
+
+    // DUT inputs come from the packed stim bus or the individual ports, so a
+    // test can drive a whole cycle of stimulus with a single write. `===`
+    // keeps the individual ports selected while stim_en is left undriven.
+    logic       dut_ena, dut_load_pulse;
+    logic [1:0] dut_addr;
+    logic [7:0] dut_data_in;
+    assign {dut_load_pulse, dut_ena, dut_addr, dut_data_in} =
+        (stim_en === 1'b1) ? stim : {load_pulse, ena, addr, data_in};
+
+    // All eight outputs on one bus so the testbench can sample the whole
+    // memory state with a single read
+    logic [63:0] mem_flat;
+    assign mem_flat = {real3_out, imag3_out, real2_out, imag2_out,
+                       real1_out, imag1_out, real0_out, imag0_out};
+
+    // Write-inhibit checker: the memory state may only change on an edge
+    // that sampled ena && load_pulse. Checked on every clock edge of every
+    // test; chk_error is sticky until the next reset.
+    logic [63:0] chk_prev_flat;
+    logic        chk_prev_write;
+    logic        chk_error;
+
+    always_ff @(posedge clk or posedge rst) begin
+        if (rst) begin
+            chk_prev_flat  <= '0;
+            chk_prev_write <= 1'b0;
+            chk_error      <= 1'b0;
+        end else begin
+            if (!chk_prev_write && mem_flat !== chk_prev_flat)
+                chk_error <= 1'b1;
+            chk_prev_flat  <= mem_flat;
+            chk_prev_write <= dut_ena && dut_load_pulse;
+        end
+    end
 
     // Instantiate the memory controller (DUT)
     memory_ctrl #(
@@ -40,10 +86,10 @@ logic [7:0] current_test_id = 0;
     ) dut (
         .clk(clk),
         .rst(rst),
-        .ena(ena),
-        .load_pulse(load_pulse),
-        .addr(addr),
-        .data_in(data_in),
+        .ena(dut_ena),
+        .load_pulse(dut_load_pulse),
+        .addr(dut_addr),
+        .data_in(dut_data_in),
         .real0_out(real0_out),
         .imag0_out(imag0_out),
         .real1_out(real1_out),
@@ -1,8 +1,10 @@
 import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
+from cocotb.triggers import FallingEdge, RisingEdge, Timer
+import os
 import random
 
+from refmodel import signed8, model_data_transform, DATA_TRANSFORM_LUT
+
 TEST_IDS = {
     "reset":   1,
     "single":  2,
@@ -12,24 +14,22 @@ TEST_IDS = {
 
 # --- Helper and Model Functions ---
 
-def signed(val, bits):
-    """Convert an unsigned value from a Verilog sim to a signed Python integer."""
-    if val >= (1 << (bits - 1)):
-        return val - (1 << bits)
-    return val
+# Signed value of every 8-bit pattern, for unpacking mem_flat
+SIGN8 = [signed8(x) for x in range(256)]
 
-def model_data_transform(data_in):
-    """
-    A bit-accurate Python model of the Verilog data transformation:
-    `$signed(nibble) << 4`. This is the "golden reference".
+def read_state(dut):
+    """Snapshot all eight memory outputs as signed (real, imag) pairs.
+
+    Reads the tb's packed mem_flat bus once instead of eight separate ports;
+    entry i sits at bits [16*i+15 : 16*i] as {real, imag}.
     """
-    real_nibble = (data_in >> 4) & 0xF
-    imag_nibble = data_in & 0xF
+    v = int(dut.mem_flat.value)
+    return [(SIGN8[(v >> (16 * i + 8)) & 0xFF], SIGN8[(v >> (16 * i)) & 0xFF])
+            for i in range(4)]
 
-    real_val = real_nibble - 16 if real_nibble >= 8 else real_nibble
-    imag_val = imag_nibble - 16 if imag_nibble >= 8 else imag_nibble
-        
-    return (real_val << 4, imag_val << 4)
+def pack_stim(addr, data_in, load_pulse, ena=1):
+    """Pack one cycle of stimulus for the tb's stim bus: {load_pulse, ena, addr, data_in}."""
+    return (load_pulse << 11) | (ena << 10) | (addr << 8) | data_in
 
 class MemoryModel:
     """A simple Python model to shadow the DUT's memory."""
@@ -37,7 +37,7 @@ class MemoryModel:
         self.mem = [(0, 0)] * 4
 
     def write(self, addr, data_in):
-        self.mem[addr] = model_data_transform(data_in)
+        self.mem[addr] = DATA_TRANSFORM_LUT[data_in]
 
     def read(self, addr):
         return self.mem[addr]
@@ -55,9 +55,9 @@ async def test_reset(dut):
     """Verify asynchronous reset clears all memory locations."""
     dut.current_test_id.value = TEST_IDS["reset"]       
     dut._log.info("Starting reset test")
-    
-    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
 
+    # Take the DUT back from the stim bus in case a failed test left it selected
+    dut.stim_en.value = 0
     dut.ena.value = 1
     dut.load_pulse.value = 1
     dut.addr.value = 1
@@ -69,16 +69,13 @@ async def test_reset(dut):
     await Timer(5, 'ns')
 
     dut._log.info("Checking outputs are zero during reset")
-    for i in range(4):
-        assert signed(getattr(dut, f"real{i}_out").value.integer, 8) == 0
-        assert signed(getattr(dut, f"imag{i}_out").value.integer, 8) == 0
+    # All eight outputs are zero exactly when the packed bus is zero
+    assert int(dut.mem_flat.value) == 0, f"Outputs not zero: {read_state(dut)}"
     
     dut.rst.value = 0
     await RisingEdge(dut.clk)
     dut._log.info("Reset released, checking outputs remain zero")
-    for i in range(4):
-        assert signed(getattr(dut, f"real{i}_out").value.integer, 8) == 0
-        assert signed(getattr(dut, f"imag{i}_out").value.integer, 8) == 0
+    assert int(dut.mem_flat.value) == 0, f"Outputs not zero: {read_state(dut)}"
 
     dut._log.info("Reset test passed")
     dut.current_test_id.value = 0                     
@@ -96,19 +93,19 @@ async def test_single_write_and_data_transform(dut):
 
     dut._log.info(f"Writing {data_in=:#x} to addr {addr}. Expecting ({expected_real}, {expected_imag})")
 
-    dut.ena.value = 1
-    dut.load_pulse.value = 1
-    dut.addr.value = addr
-    dut.data_in.value = data_in
+    # One write of the packed stim bus instead of four port writes; stim_en
+    # selects the bus over the individual ports for this one edge
+    dut.stim_en.value = 1
+    dut.stim.value = pack_stim(addr, data_in, load_pulse=1)
     await RisingEdge(dut.clk)
-    dut.load_pulse.value = 0
+    dut.stim_en.value = 0
 
     await Timer(1, 'ns')
 
-    assert signed(dut.real2_out.value.integer, 8) == expected_real
-    assert signed(dut.imag2_out.value.integer, 8) == expected_imag
-    assert signed(dut.real0_out.value.integer, 8) == 0
-    assert signed(dut.imag1_out.value.integer, 8) == 0
+    assert signed8(int(dut.real2_out.value)) == expected_real
+    assert signed8(int(dut.imag2_out.value)) == expected_imag
+    assert signed8(int(dut.real0_out.value)) == 0
+    assert signed8(int(dut.imag1_out.value)) == 0
 
     dut._log.info("Single write test passed")
     dut.current_test_id.value = 0                           
@@ -123,29 +120,25 @@ async def test_write_inhibited(dut):
     addr = 3
     data_in = 0xFF
 
-    dut._log.info("Attempting write with ena=0")
-    dut.ena.value = 0
-    dut.load_pulse.value = 1
-    dut.addr.value = addr
-    dut.data_in.value = data_in
+    # Both blocked cases back-to-back on the packed stim bus: ena=0 on the
+    # first edge, load_pulse=0 on the second. The tb checker flags any state
+    # change on an edge that did not sample a write.
+    dut._log.info("Attempting write with ena=0, then with load_pulse=0")
+    dut.stim_en.value = 1
+    dut.stim.value = pack_stim(addr, data_in, load_pulse=1, ena=0)
     await RisingEdge(dut.clk)
-    dut.load_pulse.value = 0
-
-    await Timer(1, 'ns')
-    assert signed(dut.real3_out.value.integer, 8) == 0
-
-    dut._log.info("Attempting write with load_pulse=0")
-    dut.ena.value = 1
-    dut.load_pulse.value = 0
+    dut.stim.value = pack_stim(addr, data_in, load_pulse=0, ena=1)
     await RisingEdge(dut.clk)
+    dut.stim_en.value = 0
 
-    await Timer(1, 'ns')
-    assert signed(dut.real3_out.value.integer, 8) == 0
+    await FallingEdge(dut.clk)
+    assert int(dut.mem_flat.value) == 0, f"Blocked write reached memory: {read_state(dut)}"
+    assert int(dut.chk_error.value) == 0, "Memory changed on an edge without a write"
 
     dut._log.info("Write inhibit test passed")
     dut.current_test_id.value = 0                           
 
-@cocotb.test()
+@cocotb.test(skip=os.getenv("FAST") == "1")
 async def test_randomized_writes(dut):
     """Perform a series of randomized writes and check against a model."""
     dut.current_test_id.value = TEST_IDS["random"]         
@@ -155,34 +148,36 @@ async def test_randomized_writes(dut):
     model = MemoryModel()
     num_writes = 50
 
-    for i in range(num_writes):
-        addr = random.randint(0, 3)
-        data_in = random.randint(0, 255)
-        do_write = random.choice([True, False])
+    # Draw every stimulus up front, 11 bits each: data_in[7:0], addr[9:8], do_write[10]
+    draws = [random.getrandbits(11) for _ in range(num_writes)]
+    stimuli = [((r >> 8) & 0x3, r & 0xFF, bool(r >> 10)) for r in draws]
+    stims = [pack_stim(addr, data_in, int(do_write)) for addr, data_in, do_write in stimuli]
+
+    # Pipelined by one cycle: each falling edge checks the previous write, then
+    # drives the next stimulus on the stim bus
+    dut.stim_en.value = 1
+    for i in range(num_writes + 1):
+        await FallingEdge(dut.clk)
+
+        if i > 0 and (stimuli[i - 1][2] or i == num_writes):
+            dut_state = read_state(dut)
+            model_state = model.get_all()
+            assert dut_state == model_state, f"Mismatch at iter {i - 1}\nDUT: {dut_state}\nModel: {model_state}"
 
-        dut.addr.value = addr
-        dut.data_in.value = data_in
-        dut.ena.value = 1
-        dut.load_pulse.value = 1 if do_write else 0
+        if i == num_writes:
+            break
+
+        addr, data_in, do_write = stimuli[i]
+        dut.stim.value = stims[i]
 
         if do_write:
             model.write(addr, data_in)
-        
-        await RisingEdge(dut.clk)
-        dut.load_pulse.value = 0
-
-        await Timer(1, 'ns')
-
-        dut_state = [
-            (signed(dut.real0_out.value.integer, 8), signed(dut.imag0_out.value.integer, 8)),
-            (signed(dut.real1_out.value.integer, 8), signed(dut.imag1_out.value.integer, 8)),
-            (signed(dut.real2_out.value.integer, 8), signed(dut.imag2_out.value.integer, 8)),
-            (signed(dut.real3_out.value.integer, 8), signed(dut.imag3_out.value.integer, 8)),
-        ]
-        model_state = model.get_all()
-        
-        dut._log.info(f"Iter {i}: Write {'Enabled' if do_write else 'Disabled'}. Addr={addr}, Data={data_in:#x}")
-        assert dut_state == model_state, f"Mismatch at iter {i}\nDUT: {dut_state}\nModel: {model_state}"
-    
+
+        dut._log.debug("Iter %d: Write %s. Addr=%d, Data=%#x",
+                       i, "Enabled" if do_write else "Disabled", addr, data_in)
+
+    dut.stim_en.value = 0
+    assert int(dut.chk_error.value) == 0, "Memory changed on an edge without a write"
+
     dut._log.info("Randomized write test passed")
     dut.current_test_id.value = 0                          
@@ -1,7 +1,11 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer, ClockCycles
+from cocotb.triggers import RisingEdge, Timer, ClockCycles, First
+import os
 import random
+import numpy as np
+
+from refmodel import DATA_TRANSFORM_LUT, fft_engine_ref_model, fft_engine_batch
 
 TEST_IDS = {
     "reset":      1,
@@ -11,179 +15,174 @@ TEST_IDS = {
     "random":     5,
 }
 
-def wrap8(x):
-    if x > 127: x -= 256
-    elif x < -128: x += 256
-    return x
-
-def pack_input(real, imag):
-    real_nibble_signed = real >> 4
-    imag_nibble_signed = imag >> 4
-    real_nibble_unsigned = real_nibble_signed & 0xF
-    imag_nibble_unsigned = imag_nibble_signed & 0xF
-    return (real_nibble_unsigned << 4) | imag_nibble_unsigned
-
-def pack_output(real, imag):
-    real_msbs = (real >> 4) & 0xF
-    imag_msbs = (imag >> 4) & 0xF
-    return (real_msbs << 4) | imag_msbs
-
-def model_mem_transform(data_in):
-    real_nibble = (data_in >> 4) & 0xF
-    imag_nibble = data_in & 0xF
-    real_val = (real_nibble - 16) if real_nibble >= 8 else real_nibble
-    imag_val = (imag_nibble - 16) if imag_nibble >= 8 else imag_nibble
-    return (real_val << 4, imag_val << 4)
-
-def butterfly_ref_model(a_r, a_i, b_r, b_i, t_r, t_i):
-    prod_real = t_r * b_r - t_i * b_i
-    prod_imag = t_i * b_r + t_r * b_i
-    scale = lambda val: wrap8(val >> 7)
-    pr, pi = scale(prod_real), scale(prod_imag)
-    return (wrap8(a_r + pr), wrap8(a_i + pi)), (wrap8(a_r - pr), wrap8(a_i - pi))
-
-def fft_engine_ref_model(in0, in1, in2, in3):
-    W0_r, W0_i = -128, 0
-    W1_r, W1_i = 0, -128
-    (s1_0_pos, s1_0_neg) = butterfly_ref_model(in0[0], in0[1], in2[0], in2[1], W0_r, W0_i)
-    (s1_1_pos, s1_1_neg) = butterfly_ref_model(in1[0], in1[1], in3[0], in3[1], W0_r, W0_i)
-    out0 = (wrap8(s1_0_pos[0] + s1_1_pos[0]), wrap8(s1_0_pos[1] + s1_1_pos[1]))
-    out2 = (wrap8(s1_0_pos[0] - s1_1_pos[0]), wrap8(s1_0_pos[1] - s1_1_pos[1]))
-    (out1, out3) = butterfly_ref_model(s1_0_neg[0], s1_0_neg[1], s1_1_neg[0], s1_1_neg[1], W1_r, W1_i)
-    return [out0, out1, out2, out3]
+# Clock edges between the last load_sample() returning and 'done' being
+# visible: processing -> processing_dly -> done are each one register stage.
+PROCESSING_LATENCY = 2
+
+def pack_nibbles(real, imag):
+    """Pack the top nibbles of a (real, imag) pair into one byte.
+
+    Samples go in on uio_in and results come out on uio_out with the same packing.
+    """
+    return (real & 0xF0) | ((imag >> 4) & 0xF)
 
 def top_fft_ref_model(raw_inputs):
-    transformed_inputs = [model_mem_transform(pack_input(r, i)) for r, i in raw_inputs]
+    transformed_inputs = [DATA_TRANSFORM_LUT[pack_nibbles(r, i)] for r, i in raw_inputs]
     fft_results = fft_engine_ref_model(
         transformed_inputs[0], transformed_inputs[1], transformed_inputs[2], transformed_inputs[3]
     )
-    packed_outputs = [pack_output(r, i) for r, i in fft_results]
+    packed_outputs = [pack_nibbles(*fft_results[f'out{k}']) for k in range(4)]
     return packed_outputs
 
+def top_fft_batch(raw_frames):
+    """
+    Vectorized top_fft_ref_model over an (N, 4, 2) array of raw input frames.
+    Returns an (N, 4) array of packed outputs in read order.
+    """
+    x = np.asarray(raw_frames, dtype=np.int32)
+    # pack_nibbles() keeps the top nibble and the memory sign-extends it back
+    # up by 4, so together they just clear the low nibble
+    fft_results = fft_engine_batch(x & ~0xF)
+    return (fft_results[..., 0] & 0xF0) | ((fft_results[..., 1] >> 4) & 0xF)
+
+# Directed input frames, with their expected packed outputs computed once at
+# import so no reference model work runs between clock edges
+DIRECTED_INPUTS = {
+    "complex": [(16, 32), (-48, -64), (80, -96), (-112, 112)],
+    "impulse": [(16, 0), (0, 0), (0, 0), (0, 0)],
+    "dc":      [(16, 0), (16, 0), (16, 0), (16, 0)],
+}
+DIRECTED_EXPECTED = {name: top_fft_ref_model(inputs) for name, inputs in DIRECTED_INPUTS.items()}
+
 
 async def reset_dut(dut):
     dut.rst_n.value = 0
     dut.ena.value = 0
     dut.ui_in.value = 0
     dut.uio_in.value = 0
-    await ClockCycles(dut.clk, 2)
+    # Every register in the design resets asynchronously, so a short pulse
+    # is enough; the edge after release resyncs with the clock
+    await Timer(5, 'ns')
     dut.rst_n.value = 1
     await RisingEdge(dut.clk)
     dut._log.info("DUT reset")
 
 async def load_sample(dut, data_in):
+    clk, ui_in = dut.clk, dut.ui_in   # each is used twice below
     dut.uio_in.value = data_in
-    dut.ui_in.value = 1
-    await RisingEdge(dut.clk)
-    dut.ui_in.value = 0
-    await RisingEdge(dut.clk)
+    ui_in.value = 1
+    await RisingEdge(clk)
+    ui_in.value = 0
+    await RisingEdge(clk)
 
-async def run_full_fft_test(dut, inputs):
+async def run_full_fft_test(dut, inputs, expected_outputs):
     """A complete test sequence: load 4 samples, wait, read 4 samples, and verify."""
-    expected_outputs = top_fft_ref_model(inputs)
-    dut._log.info(f"Inputs: {inputs}")
-    dut._log.info(f"Expected packed outputs: {[hex(x) for x in expected_outputs]}")
+    # Lazy %-style args: nothing is formatted unless DEBUG logging is enabled
+    dut._log.debug("Inputs: %s", inputs)
+    dut._log.debug("Expected packed outputs: %s", expected_outputs)
 
     # --- Load Phase ---
     dut.ena.value = 1
     for i in range(4):
-        packed_val = pack_input(inputs[i][0], inputs[i][1])
+        packed_val = pack_nibbles(inputs[i][0], inputs[i][1])
         await load_sample(dut, packed_val)
     
     # --- Wait for processing to finish ---
-    dut._log.info("Waiting for DUT to assert internal 'done' signal...")
-    timeout_cycles = 20
-    for i in range(timeout_cycles):
-        if dut.dut.done.value == 1:
-            dut._log.info(f"DUT asserted 'done' after {i+1} cycles.")
-            break
-        await RisingEdge(dut.clk)
-    else: 
-        assert False, f"Timeout: DUT did not assert 'done' after {timeout_cycles} cycles."
+    # Resume as soon as 'done' rises; PROCESSING_LATENCY only bounds the wait
+    done = dut.dut.done
+    await First(RisingEdge(done), ClockCycles(dut.clk, PROCESSING_LATENCY))
+    assert int(done.value) == 1, \
+        f"DUT did not assert 'done' {PROCESSING_LATENCY} cycles after the last load."
 
 
     # --- Read and Verify Phase ---
+    clk, ui_in, uio_oe, uio_out = dut.clk, dut.ui_in, dut.uio_oe, dut.uio_out   # resolve the handles once for the loop
     actual_outputs = []
     for i in range(4):
         # 1. Assert the read trigger
-        dut.ui_in.value = 2
-        await RisingEdge(dut.clk)
+        ui_in.value = 2
+        await RisingEdge(clk)
         
         # 2. Check the output enable
-        assert dut.uio_oe.value.integer == 0xFF, f"uio_oe was not asserted for output {i}."
-        
-        # 3. Sample the output data and check it
-        dut_out = dut.uio_out.value.integer
-        actual_outputs.append(dut_out)
+        assert int(uio_oe.value) == 0xFF, f"uio_oe was not asserted for output {i}."
         
-        assert dut_out == expected_outputs[i], \
-            f"Output {i} mismatch: DUT={hex(dut_out)}, Expected={hex(expected_outputs[i])}"
+        # 3. Sample the output data; the frame is checked after the loop
+        actual_outputs.append(int(uio_out.value))
 
         # 4. De-assert the read trigger.
-        dut.ui_in.value = 0
+        ui_in.value = 0
 
         # 5. Wait one more clock cycle.
-        await RisingEdge(dut.clk)
-        assert dut.uio_oe.value == 0, f"uio_oe did not de-assert after reading output {i}"
+        await RisingEdge(clk)
+        assert int(uio_oe.value) == 0, f"uio_oe did not de-assert after reading output {i}"
 
-    dut._log.info(f"Actual packed outputs: {[hex(x) for x in actual_outputs]}")
+    dut._log.debug("Actual packed outputs: %s", actual_outputs)
+    # One compare for the whole frame; the hex lists are only built on failure
+    assert actual_outputs == list(expected_outputs), \
+        f"Output mismatch: DUT={[hex(x) for x in actual_outputs]}, Expected={[hex(x) for x in expected_outputs]}"
     dut._log.info("Test case passed.")
 
-@cocotb.test()
-async def test_reset_and_initial_state(dut):
+async def scenario_reset_and_initial_state(dut):
     dut.current_test_id.value = TEST_IDS["reset"]          
     dut._log.info("Starting reset test")
-    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
     await reset_dut(dut)
-    assert dut.uio_oe.value == 0, "uio_oe should be low after reset"
+    assert int(dut.uio_oe.value) == 0, "uio_oe should be low after reset"
     dut._log.info("Reset test passed")
     dut.current_test_id.value = 0                           
 
-@cocotb.test()
-async def test_full_cycle_complex(dut):
+async def scenario_full_cycle_complex(dut):
     dut.current_test_id.value = TEST_IDS["complex"]        
     dut._log.info("Starting full cycle test with complex values")
-    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
     await reset_dut(dut)
-    inputs = [(16, 32), (-48, -64), (80, -96), (-112, 112)]
-    await run_full_fft_test(dut, inputs)
+    await run_full_fft_test(dut, DIRECTED_INPUTS["complex"], DIRECTED_EXPECTED["complex"])
     dut.current_test_id.value = 0                           
 
-@cocotb.test()
-async def test_fft_impulse(dut):
+async def scenario_fft_impulse(dut):
     dut.current_test_id.value = TEST_IDS["impulse"]        
     dut._log.info("Starting impulse response test")
-    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
     await reset_dut(dut)
-    inputs = [(16, 0), (0, 0), (0, 0), (0, 0)]
-    await run_full_fft_test(dut, inputs)
+    await run_full_fft_test(dut, DIRECTED_INPUTS["impulse"], DIRECTED_EXPECTED["impulse"])
     dut.current_test_id.value = 0                           
 
-@cocotb.test()
-async def test_fft_dc_input(dut):
+async def scenario_fft_dc_input(dut):
     dut.current_test_id.value = TEST_IDS["dc"]            
     dut._log.info("Starting DC input test")
-    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
     await reset_dut(dut)
-    inputs = [(16, 0), (16, 0), (16, 0), (16, 0)]
-    await run_full_fft_test(dut, inputs)
+    await run_full_fft_test(dut, DIRECTED_INPUTS["dc"], DIRECTED_EXPECTED["dc"])
     dut.current_test_id.value = 0                          
 
+DIRECTED_SCENARIOS = [
+    scenario_reset_and_initial_state,
+    scenario_full_cycle_complex,
+    scenario_fft_impulse,
+    scenario_fft_dc_input,
+]
+
 @cocotb.test()
+async def test_directed_scenarios(dut):
+    """Run every directed scenario back-to-back, resetting between them."""
+    cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
+    for scenario in DIRECTED_SCENARIOS:
+        await scenario(dut)
+
+@cocotb.test(skip=os.getenv("FAST") == "1")
 async def test_randomized_end_to_end(dut):
     dut.current_test_id.value = TEST_IDS["random"]         
     dut._log.info("Starting randomized end-to-end test")
     cocotb.start_soon(Clock(dut.clk, 10, units="ns").start())
     valid_values = list(range(-128, 128, 16))
     num_tests = 5
+    # Draw every frame up front in a single call and evaluate the reference
+    # model over the whole batch at once
+    samples = random.choices(valid_values, k=num_tests * 8)
+    frames = [list(zip(samples[i:i + 8:2], samples[i + 1:i + 8:2]))
+              for i in range(0, num_tests * 8, 8)]
+    expected = top_fft_batch(frames).tolist()
+    # Reset once: reading the fourth output clears 'done' and both the sample
+    # and output counters wrap back to 0, so each frame leaves the DUT idle
+    # and the next one loads over the previous samples back-to-back
+    await reset_dut(dut)
     for i in range(num_tests):
-        dut._log.info(f"--- Randomized Test Iteration {i+1}/{num_tests} ---")
-        await reset_dut(dut)
-        inputs = [
-            (random.choice(valid_values), random.choice(valid_values)),
-            (random.choice(valid_values), random.choice(valid_values)),
-            (random.choice(valid_values), random.choice(valid_values)),
-            (random.choice(valid_values), random.choice(valid_values))
-        ]
-        await run_full_fft_test(dut, inputs)
+        dut._log.debug("--- Randomized Test Iteration %d/%d ---", i + 1, num_tests)
+        await run_full_fft_test(dut, frames[i], expected[i])
     dut.current_test_id.value = 0                           
@@ -18,6 +18,7 @@ module tt_um_FFT_engine_tb (
 logic [7:0] current_test_id = 0;
 
     // Dump signals for waveform viewing
+`ifndef NO_WAVES
     string vcd_name;
     initial begin
 `ifdef VCD_PATH
@@ -29,6 +30,7 @@ logic [7:0] current_test_id = 0;
         $dumpvars(0, tt_um_FFT_engine_tb);
         #1;
     end
+`endif
 
     // Instantiate the top-level DUT
     tt_um_FFT_engine dut (